@@ -4,16 +4,20 @@
 """
 
 import argparse
+import multiprocessing
 import sys
 import os
-from text_to_qr import TextToQRCode
+from pathlib import Path
 
 
 def read_from_file(filepath):
-    """从文件读取文本"""
+    """从文件读取文本，返回UTF-8字节串（后续直接按字节分割，无需重新编码）"""
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return f.read()
+        data = Path(filepath).read_bytes()
+        # 与文本模式读取保持一致，统一换行符
+        if b'\r' in data:
+            data = data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+        return data
     except FileNotFoundError:
         print(f"错误: 文件 '{filepath}' 不存在")
         sys.exit(1)
@@ -72,17 +76,38 @@ def main():
                         help='每个小方块的像素大小（默认: 10）')
     parser.add_argument('-s', '--border', type=int, default=4,
                         help='边框大小（小方块数量，默认: 4）')
+    parser.add_argument('-c', '--compress-level', type=int,
+                        choices=range(10), default=9, metavar='{0-9}',
+                        help='PNG压缩级别（默认: 9，文件最小；1 保存最快）')
+    parser.add_argument('-O', '--optimize-png', action='store_true',
+                        help='保存后使用 oxipng/pngcrush 进一步压缩PNG（需已安装）')
+    parser.add_argument('--oxipng-level', type=int, choices=range(7),
+                        default=2, metavar='{0-6}',
+                        help='oxipng 优化级别（默认: 2）')
     parser.add_argument('-i', '--info', action='store_true',
                         help='只显示文本信息，不生成二维码')
 
     args = parser.parse_args()
 
+    # 解析参数后再导入，--help 等情况无需加载二维码模块
+    from text_to_qr import TextToQRCode, png_optimizer_available
+
+    if args.optimize_png and not png_optimizer_available():
+        print("错误: 使用 -O/--optimize-png 需要先安装 oxipng（pip install pyoxipng 或命令行工具）或 pngcrush")
+        sys.exit(1)
+
     # 获取文本内容
     text = None
+    text_bytes = None
     if args.text:
         text = args.text
     elif args.file:
-        text = read_from_file(args.file)
+        text_bytes = read_from_file(args.file)
+        try:
+            text = text_bytes.decode('utf-8')
+        except UnicodeDecodeError as e:
+            print(f"错误: 读取文件失败 - {e}")
+            sys.exit(1)
     else:
         text = read_from_stdin()
 
@@ -90,15 +115,22 @@ def main():
         print("错误: 文本内容为空")
         sys.exit(1)
 
+    # 只编码一次，后续统计和分割都复用
+    if text_bytes is None:
+        text_bytes = text.encode('utf-8')
+
     # 创建转换器
     converter = TextToQRCode(
         error_correction=args.error_correction,
         box_size=args.box_size,
-        border=args.border
+        border=args.border,
+        compress_level=args.compress_level,
+        optimize_png=args.optimize_png,
+        oxipng_level=args.oxipng_level
     )
 
     # 显示文本信息
-    info = converter.get_text_info(text)
+    info = converter.get_text_info(text, text_bytes)
     print("\n" + "="*50)
     print("文本信息:")
     print("="*50)
@@ -121,7 +153,7 @@ def main():
     print("="*50)
 
     try:
-        image_paths = converter.text_to_qrcode(text, args.output)
+        image_paths = converter.text_to_qrcode(text, args.output, text_bytes)
 
         print("\n成功生成二维码!")
         print(f"输出文件:")
@@ -144,4 +176,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # 打包为可执行文件后，多进程生成二维码需要此调用
+    multiprocessing.freeze_support()
     main()
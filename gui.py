@@ -6,9 +6,12 @@ GUI版本的文本转二维码工具
 
 import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog, messagebox
-from PIL import Image, ImageTk
 import os
-from text_to_qr import TextToQRCode
+import multiprocessing
+import queue
+import threading
+from pathlib import Path
+from text_to_qr import TextToQRCode, get_text_info
 
 
 class QRCodeGeneratorGUI:
@@ -18,12 +21,18 @@ class QRCodeGeneratorGUI:
         self.root.geometry("900x700")
         self.root.resizable(True, True)
 
-        # 存储生成的图片对象（防止被垃圾回收）
-        self.qr_images = []
+        # 后台生成线程向主线程传递预览图的队列
+        self._queue = queue.Queue()
+
+        # 文本信息延迟更新的定时器ID（合并连续的按键事件）
+        self._update_after_id = None
 
         # 创建界面
         self.create_widgets()
 
+        # 绑定文本变化事件
+        self.text_input.bind('<<Modified>>', self.on_text_change)
+
     def create_widgets(self):
         """创建界面组件"""
 
@@ -159,12 +168,14 @@ class QRCodeGeneratorGUI:
 
         if filename:
             try:
-                with open(filename, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    self.text_input.delete(1.0, tk.END)
-                    self.text_input.insert(1.0, content)
-                    self.status_label.config(text=f"已加载文件: {os.path.basename(filename)}")
-                    self.update_info()
+                content = Path(filename).read_bytes().decode('utf-8')
+                # 与文本模式读取保持一致，统一换行符
+                if '\r' in content:
+                    content = content.replace('\r\n', '\n').replace('\r', '\n')
+                self.text_input.delete(1.0, tk.END)
+                self.text_input.insert(1.0, content)
+                self.status_label.config(text=f"已加载文件: {os.path.basename(filename)}")
+                self.update_info()
             except Exception as e:
                 messagebox.showerror("错误", f"读取文件失败:\n{str(e)}")
 
@@ -179,8 +190,23 @@ class QRCodeGeneratorGUI:
         value = self.error_correction_var.get()
         return value[0]  # 返回 'L', 'M', 'Q', 或 'H'
 
+    def on_text_change(self, event=None):
+        """文本变化时重置修改标志并安排更新文本信息"""
+        self.text_input.edit_modified(False)
+        self._schedule_update()
+
+    def _schedule_update(self):
+        """延迟150毫秒更新文本信息，期间的新输入会重新计时"""
+        if self._update_after_id:
+            self.root.after_cancel(self._update_after_id)
+        self._update_after_id = self.root.after(150, self.update_info)
+
     def update_info(self):
         """更新文本信息显示"""
+        if self._update_after_id:
+            self.root.after_cancel(self._update_after_id)
+            self._update_after_id = None
+
         text = self.text_input.get(1.0, tk.END).strip()
 
         if not text:
@@ -190,8 +216,7 @@ class QRCodeGeneratorGUI:
             self.info_text.config(state=tk.DISABLED)
             return
 
-        converter = TextToQRCode(error_correction=self.get_error_correction_level())
-        info = converter.get_text_info(text)
+        info = get_text_info(text, self.get_error_correction_level())
 
         info_str = f"""字符数: {info['char_count']}
 字节数: {info['byte_count']}
@@ -205,7 +230,7 @@ class QRCodeGeneratorGUI:
         self.info_text.config(state=tk.DISABLED)
 
     def generate_qrcode(self):
-        """生成二维码"""
+        """生成二维码（在后台线程中生成，界面保持响应）"""
         text = self.text_input.get(1.0, tk.END).strip()
 
         if not text:
@@ -215,58 +240,106 @@ class QRCodeGeneratorGUI:
         # 清空之前的预览
         for widget in self.preview_container.winfo_children():
             widget.destroy()
-        self.qr_images.clear()
 
-        # 更新状态
+        # 更新状态，生成期间禁用按钮
         self.status_label.config(text="正在生成二维码...")
-        self.root.update()
+        self.generate_btn.config(state=tk.DISABLED)
+
+        # 创建转换器
+        converter = TextToQRCode(
+            error_correction=self.get_error_correction_level(),
+            box_size=10,
+            border=4,
+            compress_level=1  # 仅用于预览，优先速度
+        )
+
+        worker = threading.Thread(
+            target=self._generate_worker,
+            args=(converter, text),
+            daemon=True
+        )
+        worker.start()
+        self.root.after(30, self._drain_queue)
 
+    def _generate_worker(self, converter, text):
+        """后台线程：逐个生成二维码预览图，通过队列交给主线程显示"""
         try:
-            # 创建转换器
-            converter = TextToQRCode(
-                error_correction=self.get_error_correction_level(),
-                box_size=10,
-                border=4
-            )
-
-            # 生成二维码（不保存文件）
-            qr_images_data = converter.generate_qrcode_images(text)
-
-            # 显示预览
-            for i, (img, text_part) in enumerate(qr_images_data):
+            # 首次生成预览时再导入 PIL
+            from PIL import Image
+
+            # 分割文本
+            text_parts = converter.split_text(text)
+            num_parts = len(text_parts)
+
+            # 逐个生成二维码（不保存文件）
+            for i, (img, text_part) in enumerate(converter.generate_part_images(text_parts)):
+                # 调整大小以适应预览（黑白二维码无需高质量插值，resize 本身返回新图片）
+                preview_size = min(300, img.width)
+                preview = img.resize((preview_size, preview_size), Image.Resampling.NEAREST)
+                # 及时释放完整尺寸的图片
+                img.close()
+                self._queue.put(('image', i, num_parts, preview))
+
+            self._queue.put(('done', num_parts))
+        except Exception as e:
+            self._queue.put(('error', e))
+
+    def _drain_queue(self):
+        """主线程：取出后台线程生成的预览图并显示（Tk 组件只能在主线程中操作）"""
+        from PIL import ImageTk
+
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            kind = item[0]
+            if kind == 'image':
+                _, i, num_parts, preview = item
+
                 # 创建每个二维码的框架
                 qr_frame = ttk.Frame(self.preview_container, padding="5")
                 qr_frame.pack(fill=tk.X, pady=5)
 
                 # 标题
-                if len(qr_images_data) > 1:
-                    title = f"二维码 {i+1}/{len(qr_images_data)}"
+                if num_parts > 1:
+                    title = f"二维码 {i+1}/{num_parts}"
                 else:
                     title = "二维码"
 
                 title_label = ttk.Label(qr_frame, text=title, font=("Arial", 10, "bold"))
                 title_label.pack()
 
-                # 调整大小以适应预览
-                img_copy = img.copy()
-                img_copy.thumbnail((300, 300), Image.Resampling.LANCZOS)
-                photo = ImageTk.PhotoImage(img_copy)
-                self.qr_images.append(photo)  # 保持引用
+                photo = ImageTk.PhotoImage(preview)
 
                 img_label = ttk.Label(qr_frame, image=photo)
+                # 引用保存在组件上（防止被垃圾回收），组件销毁时一并释放
+                img_label.image = photo
                 img_label.pack(pady=5)
 
-            # 更新状态
-            if len(qr_images_data) > 1:
-                self.status_label.config(
-                    text=f"成功生成 {len(qr_images_data)} 个二维码！请按顺序扫描。"
-                )
-            else:
-                self.status_label.config(text="成功生成二维码！")
+                if num_parts > 1:
+                    self.status_label.config(text=f"正在生成二维码... ({i+1}/{num_parts})")
 
-        except Exception as e:
-            messagebox.showerror("错误", f"生成二维码失败:\n{str(e)}")
-            self.status_label.config(text="生成失败")
+            elif kind == 'done':
+                num_parts = item[1]
+                # 更新状态
+                if num_parts > 1:
+                    self.status_label.config(
+                        text=f"成功生成 {num_parts} 个二维码！请按顺序扫描。"
+                    )
+                else:
+                    self.status_label.config(text="成功生成二维码！")
+                self.generate_btn.config(state=tk.NORMAL)
+                return
+
+            elif kind == 'error':
+                messagebox.showerror("错误", f"生成二维码失败:\n{str(item[1])}")
+                self.status_label.config(text="生成失败")
+                self.generate_btn.config(state=tk.NORMAL)
+                return
+
+        self.root.after(30, self._drain_queue)
 
 
 def main():
@@ -281,17 +354,10 @@ def main():
 
     app = QRCodeGeneratorGUI(root)
 
-    # 绑定文本变化事件
-    def on_text_change(event=None):
-        app.update_info()
-
-    app.text_input.bind('<<Modified>>', lambda e: (
-        app.text_input.edit_modified(False),
-        on_text_change()
-    ))
-
     root.mainloop()
 
 
 if __name__ == "__main__":
+    # 打包为可执行文件后，多进程生成二维码需要此调用
+    multiprocessing.freeze_support()
     main()
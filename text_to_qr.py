@@ -3,27 +3,330 @@
 用于将文本内容转换为二维码图片
 """
 
-import qrcode
-from PIL import Image
-import math
+# numpy、PIL、qrcode 等较重的依赖均在函数内按需导入，
+# 只查看文本信息时无需加载，缩短命令行启动时间
+import io
+import os
+import shutil
+import subprocess
+from collections import OrderedDict
+
+
+# 二维码容量限制（字节）
+# Low error correction: ~2953 bytes
+# Medium: ~2331 bytes
+# Quartile: ~1663 bytes
+# High: ~1273 bytes
+MAX_BYTES_PER_QR = {
+    'L': 2900,  # Low - 7% error correction
+    'M': 2300,  # Medium - 15% error correction
+    'Q': 1600,  # Quartile - 25% error correction
+    'H': 1200   # High - 30% error correction
+}
+
+# 片段数达到该值时才使用多进程生成：子进程需重新启动解释器并导入 numpy/segno/PIL，
+# 启动开销（打包后的 exe 中更明显）与编码数个片段的耗时相当
+_PROCESS_POOL_MIN_TASKS = 8
+
+# 最近生成的PNG数据缓存（相同参数的二维码输出完全相同）
+_PNG_CACHE = OrderedDict()
+_PNG_CACHE_SIZE = 32
+
+
+def png_optimizer_available():
+    """
+    检查是否安装了可用的PNG优化工具（oxipng 的 Python 绑定或命令行工具，或 pngcrush）
+
+    Returns:
+        bool: 是否可用
+    """
+    try:
+        import oxipng  # noqa: F401
+        return True
+    except ImportError:
+        return bool(shutil.which('oxipng') or shutil.which('pngcrush'))
+
+
+def _optimize_png(filename, level=2):
+    """
+    使用 oxipng / pngcrush 对已保存的PNG文件做无损压缩
+
+    优先使用 oxipng 的 Python 绑定，其次是命令行工具；都不可用时不做处理
+    （可先用 png_optimizer_available 检查）。
+
+    Args:
+        filename: PNG文件路径
+        level: oxipng 优化级别（0-6）
+    """
+    try:
+        import oxipng
+    except ImportError:
+        oxipng = None
+
+    if oxipng is not None:
+        oxipng.optimize(filename, level=level)
+        return
+
+    if shutil.which('oxipng'):
+        cmd = ['oxipng', '-o', str(level), '--strip', 'safe', '-q', filename]
+    elif shutil.which('pngcrush'):
+        cmd = ['pngcrush', '-q', '-ow', filename]
+    else:
+        return
+
+    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _utf8_byte_count(text):
+    """
+    计算文本的UTF-8字节数
+    """
+    # 纯ASCII文本的字节数等于字符数，无需编码
+    if text.isascii():
+        return len(text)
+    return len(text.encode('utf-8'))
+
+
+def get_text_info(text, error_correction='M', text_bytes=None):
+    """
+    获取文本信息，无需创建 TextToQRCode 实例
+
+    Args:
+        text: 文本内容
+        error_correction: 错误纠正级别 ('L', 'M', 'Q', 'H')
+        text_bytes: 文本的UTF-8编码（已编码时传入，避免重复编码）
+
+    Returns:
+        dict: 包含文本长度、字节数、需要的二维码数量等信息
+    """
+    if text_bytes is None:
+        byte_count = _utf8_byte_count(text)
+    else:
+        byte_count = len(text_bytes)
+    max_bytes = MAX_BYTES_PER_QR[error_correction]
+    num_qrcodes = (byte_count + max_bytes - 1) // max_bytes
+
+    return {
+        'char_count': len(text),
+        'byte_count': byte_count,
+        'max_bytes_per_qr': max_bytes,
+        'num_qrcodes': num_qrcodes,
+        'error_correction': error_correction
+    }
+
+
+def split_bytes(text_bytes, max_bytes):
+    """
+    将UTF-8字节串按最大字节数分割，确保不会在UTF-8字符中间切断
+
+    Args:
+        text_bytes: UTF-8编码的字节串
+        max_bytes: 每段的最大字节数
+
+    Returns:
+        list: 解码后的文本片段列表
+    """
+    total = len(text_bytes)
+    chunks = []
+
+    start = 0
+    while start < total:
+        end = min(start + max_bytes, total)
+        # UTF-8 后续字节的形式为 10xxxxxx，向前退到字符起始字节处切分
+        while end < total and (text_bytes[end] & 0xC0) == 0x80:
+            end -= 1
+
+        chunks.append(text_bytes[start:end].decode('utf-8'))
+        start = end
+
+    return chunks
+
+
+def _make_matrix(text, error_correction):
+    """
+    生成二维码模块矩阵
+
+    优先使用 segno，未安装时回退到 qrcode。
+
+    Args:
+        text: 要编码的文本
+        error_correction: 错误纠正级别 ('L', 'M', 'Q', 'H')
+
+    Returns:
+        list: 模块矩阵，每行一个序列，真值表示黑色模块（不含边框）
+    """
+    try:
+        # segno 的编码速度明显快于 qrcode，可用时优先使用
+        import segno
+    except ImportError:
+        segno = None
+
+    if segno is not None:
+        # boost_error=False 保持用户指定的纠错级别，make_qr 避免生成 Micro QR，
+        # encoding='utf-8' 与 qrcode 一致，始终按UTF-8字节写入（与分割时的字节预算一致）
+        qr = segno.make_qr(text, error=error_correction, boost_error=False,
+                           encoding='utf-8')
+        return qr.matrix
+
+    import qrcode
+
+    qr = qrcode.QRCode(
+        version=None,  # 自动选择版本
+        error_correction=getattr(qrcode.constants, f'ERROR_CORRECT_{error_correction}'),
+    )
+    qr.add_data(text)
+    qr.make(fit=True)
+    return qr.modules
+
+
+def _matrix_to_pixels(matrix, box_size, border):
+    """
+    将模块矩阵放大为像素矩阵
+
+    Args:
+        matrix: 模块矩阵，1 表示黑色模块
+        box_size: 每个小方块的像素大小
+        border: 边框大小（小方块数量）
+
+    Returns:
+        numpy.ndarray: uint8 像素矩阵，1 表示白色，0 表示黑色
+    """
+    import numpy as np
+
+    modules = np.asarray(matrix, dtype=np.uint8)
+    # 反转为 1=白色，并加上白色边框
+    modules = np.pad(1 - modules, border, constant_values=1)
+    # 在 NumPy 中一次性放大，避免逐个模块绘制矩形
+    return modules.repeat(box_size, axis=0).repeat(box_size, axis=1)
+
+
+def _pixels_to_image(pixels):
+    """
+    将像素矩阵转换为1位黑白 PIL 图片
+    """
+    from PIL import Image
+
+    return Image.fromarray(pixels * 255, mode='L').convert('1')
+
+
+def _encode_png(pixels, compress_level):
+    """
+    将像素矩阵编码为1位灰度PNG
+
+    优先使用 pypng 直接写出按位打包的行数据，未安装时使用 Pillow。
+
+    Args:
+        pixels: uint8 像素矩阵，1 表示白色，0 表示黑色
+        compress_level: PNG压缩级别（0-9）
+
+    Returns:
+        bytes: PNG文件内容
+    """
+    import numpy as np
+
+    buffer = io.BytesIO()
+
+    try:
+        # pypng 可直接写出1位灰度PNG，无需经过 Pillow 的图像对象
+        import png
+    except ImportError:
+        png = None
+
+    if png is not None:
+        height, width = pixels.shape
+        writer = png.Writer(width, height, greyscale=True, bitdepth=1,
+                            compression=compress_level)
+        rows = np.packbits(pixels, axis=1)
+        writer.write_packed(buffer, (row.tobytes() for row in rows))
+    else:
+        _pixels_to_image(pixels).save(
+            buffer,
+            format='PNG',
+            optimize=compress_level >= 9,
+            compress_level=compress_level
+        )
+
+    return buffer.getvalue()
+
+
+def _make_png(args):
+    """
+    生成单个二维码的PNG文件内容（模块级函数，便于在子进程中执行）
+
+    Args:
+        args: (文本, 错误纠正级别, 小方块像素大小, 边框大小, PNG压缩级别) 元组
+
+    Returns:
+        bytes: PNG文件内容
+    """
+    text, error_correction, box_size, border, compress_level = args
+    matrix = _make_matrix(text, error_correction)
+    return _encode_png(_matrix_to_pixels(matrix, box_size, border), compress_level)
+
+
+def _parallel_imap(func, items):
+    """
+    任务较多时使用多进程并行执行，任务较少或单核时直接在当前进程执行
+
+    结果按输入顺序逐个产生，每个任务完成后即可取用。
+
+    Args:
+        func: 模块级函数（需可被 pickle）
+        items: 参数列表
+
+    Yields:
+        按输入顺序排列的结果
+    """
+    max_workers = min(len(items), os.cpu_count() or 1)
+    if len(items) < _PROCESS_POOL_MIN_TASKS or max_workers <= 1:
+        for item in items:
+            yield func(item)
+        return
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    # 统一使用 spawn：GUI 在后台线程中调用，fork 多线程的 Tk 进程可能死锁
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+        yield from executor.map(func, items)
+
+
+def _iter_pngs(tasks):
+    """
+    逐个生成PNG数据，命中缓存的直接返回，其余并行生成后加入缓存
+
+    Args:
+        tasks: _make_png 的参数元组列表
+
+    Yields:
+        bytes: 按输入顺序排列的PNG文件内容
+    """
+    # 先取出已缓存的结果，避免处理过程中被淘汰
+    known = {task: _PNG_CACHE[task] for task in tasks if task in _PNG_CACHE}
+    missing = [task for task in dict.fromkeys(tasks) if task not in known]
+    computed = _parallel_imap(_make_png, missing)
+
+    for task in tasks:
+        if task not in known:
+            known[task] = next(computed)
+
+        _PNG_CACHE[task] = known[task]
+        _PNG_CACHE.move_to_end(task)
+        while len(_PNG_CACHE) > _PNG_CACHE_SIZE:
+            _PNG_CACHE.popitem(last=False)
+
+        yield known[task]
 
 
 class TextToQRCode:
     """文本转二维码转换器"""
 
     # 二维码容量限制（字节）
-    # Low error correction: ~2953 bytes
-    # Medium: ~2331 bytes
-    # Quartile: ~1663 bytes
-    # High: ~1273 bytes
-    MAX_BYTES_PER_QR = {
-        'L': 2900,  # Low - 7% error correction
-        'M': 2300,  # Medium - 15% error correction
-        'Q': 1600,  # Quartile - 25% error correction
-        'H': 1200   # High - 30% error correction
-    }
+    MAX_BYTES_PER_QR = MAX_BYTES_PER_QR
 
-    def __init__(self, error_correction='M', box_size=10, border=4):
+    def __init__(self, error_correction='M', box_size=10, border=4, compress_level=9,
+                 optimize_png=False, oxipng_level=2):
         """
         初始化二维码生成器
 
@@ -31,65 +334,40 @@ class TextToQRCode:
             error_correction: 错误纠正级别 ('L', 'M', 'Q', 'H')
             box_size: 每个小方块的像素大小
             border: 边框大小（小方块数量）
+            compress_level: PNG压缩级别（0-9，9为文件最小，1为保存最快）
+            optimize_png: 保存后是否再用 oxipng/pngcrush 压缩PNG文件
+            oxipng_level: oxipng 优化级别（0-6）
         """
         self.error_correction_level = error_correction
         self.box_size = box_size
         self.border = border
+        self.compress_level = compress_level
+        self.optimize_png = optimize_png
+        self.oxipng_level = oxipng_level
 
-        # 设置错误纠正级别
-        self.error_correction_map = {
-            'L': qrcode.constants.ERROR_CORRECT_L,
-            'M': qrcode.constants.ERROR_CORRECT_M,
-            'Q': qrcode.constants.ERROR_CORRECT_Q,
-            'H': qrcode.constants.ERROR_CORRECT_H
-        }
-
-    def split_text(self, text):
+    def split_text(self, text, text_bytes=None):
         """
         将长文本分割成多个片段
 
         Args:
             text: 原始文本
+            text_bytes: 文本的UTF-8编码（已编码时传入，避免重复编码）
 
         Returns:
             list: 文本片段列表
         """
         max_bytes = self.MAX_BYTES_PER_QR[self.error_correction_level]
-        text_bytes = text.encode('utf-8')
+        if text_bytes is None:
+            text_bytes = text.encode('utf-8')
 
         if len(text_bytes) <= max_bytes:
             return [text]
 
-        # 计算需要分成多少个二维码
-        num_parts = math.ceil(len(text_bytes) / max_bytes)
-        parts = []
-
-        # 分割文本，确保不会在UTF-8字符中间切断
-        start = 0
-        for i in range(num_parts):
-            # 计算这一段的结束位置
-            end = min(start + max_bytes, len(text_bytes))
-
-            # 确保不会在UTF-8字符中间切断
-            while end < len(text_bytes):
-                try:
-                    # 尝试解码，如果成功则说明没有切断字符
-                    text_bytes[start:end].decode('utf-8')
-                    break
-                except UnicodeDecodeError:
-                    # 如果失败，向前移动一个字节
-                    end -= 1
-
-            part_text = text_bytes[start:end].decode('utf-8')
-            # 添加分页信息
-            if num_parts > 1:
-                parts.append(f"[{i+1}/{num_parts}]\n{part_text}")
-            else:
-                parts.append(part_text)
-
-            start = end
+        chunks = split_bytes(text_bytes, max_bytes)
+        num_parts = len(chunks)
 
-        return parts
+        # 添加分页信息
+        return [f"[{i+1}/{num_parts}]\n{chunk}" for i, chunk in enumerate(chunks)]
 
     def generate_qrcode(self, text):
         """
@@ -101,90 +379,136 @@ class TextToQRCode:
         Returns:
             PIL.Image: 二维码图片对象
         """
-        qr = qrcode.QRCode(
-            version=None,  # 自动选择版本
-            error_correction=self.error_correction_map[self.error_correction_level],
-            box_size=self.box_size,
-            border=self.border,
-        )
+        from PIL import Image
+
+        task = (text, self.error_correction_level, self.box_size, self.border,
+                self.compress_level)
+        return Image.open(io.BytesIO(next(_iter_pngs([task]))))
+
+    def _qrcode_tasks(self, text_parts):
+        """
+        构造每个文本片段的二维码生成参数
 
-        qr.add_data(text)
-        qr.make(fit=True)
+        Args:
+            text_parts: 文本片段列表
 
-        img = qr.make_image(fill_color="black", back_color="white")
-        return img
+        Returns:
+            list: _make_png 的参数元组列表
+        """
+        return [
+            (part, self.error_correction_level, self.box_size, self.border,
+             self.compress_level)
+            for part in text_parts
+        ]
 
-    def generate_qrcode_images(self, text):
+    def generate_qrcode_images(self, text, text_bytes=None):
         """
         生成二维码图片对象（不保存到文件）
 
         Args:
             text: 要转换的文本
+            text_bytes: 文本的UTF-8编码（已编码时传入，避免重复编码）
 
         Returns:
-            list: 包含 (PIL.Image, 文本片段) 元组的列表
+            iterator: 逐个产生 (PIL.Image, 文本片段) 元组
         """
-        # 分割文本
-        text_parts = self.split_text(text)
+        return self.generate_part_images(self.split_text(text, text_bytes))
+
+    def generate_part_images(self, text_parts):
+        """
+        逐个生成已分割文本片段的二维码图片对象
+
+        图片按需解码，调用方用完后 close() 即可保证同时只占用一张完整尺寸图片的内存。
 
-        # 生成二维码
-        images = []
-        for part in text_parts:
-            img = self.generate_qrcode(part)
-            images.append((img, part))
+        Args:
+            text_parts: split_text 返回的文本片段列表
+
+        Yields:
+            tuple: (PIL.Image, 文本片段)
+        """
+        from PIL import Image
+
+        # 生成二维码（片段较多时并行生成），每个片段完成后立即产生
+        png_data = _iter_pngs(self._qrcode_tasks(text_parts))
 
-        return images
+        for data, part in zip(png_data, text_parts):
+            yield Image.open(io.BytesIO(data)), part
 
-    def text_to_qrcode(self, text, output_prefix="qrcode"):
+    def text_to_qrcode(self, text, output_prefix="qrcode", text_bytes=None):
         """
         将文本转换为二维码图片
 
         Args:
             text: 要转换的文本
             output_prefix: 输出文件名前缀
+            text_bytes: 文本的UTF-8编码（已编码时传入，避免重复编码）
 
         Returns:
             list: 生成的图片文件路径列表
         """
         # 分割文本
-        text_parts = self.split_text(text)
+        text_parts = self.split_text(text, text_bytes)
 
-        # 生成二维码
-        image_paths = []
-        for i, part in enumerate(text_parts):
-            img = self.generate_qrcode(part)
+        # 生成PNG数据（片段较多时多进程并行生成）
+        png_data = list(_iter_pngs(self._qrcode_tasks(text_parts)))
 
+        image_paths = []
+        for i in range(len(text_parts)):
             if len(text_parts) > 1:
                 filename = f"{output_prefix}_{i+1}_of_{len(text_parts)}.png"
             else:
                 filename = f"{output_prefix}.png"
-
-            img.save(filename)
             image_paths.append(filename)
 
+        # 写入文件；启用PNG优化时，优化工具耗时较长，用多线程同时处理多个文件
+        pairs = list(zip(png_data, image_paths))
+        if self.optimize_png and len(pairs) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=min(8, len(pairs))) as executor:
+                list(executor.map(self._write_png, pairs))
+        else:
+            for pair in pairs:
+                self._write_png(pair)
+
         return image_paths
 
-    def get_text_info(self, text):
+    def _write_png(self, pair):
+        """
+        将PNG数据写入文件
+
+        Args:
+            pair: (PNG文件内容, 文件名) 元组
+        """
+        data, filename = pair
+
+        # PNG数据已在内存中，直接用底层文件描述符写入，跳过缓冲文件对象
+        # （Windows 下需要 O_BINARY，否则换行符会被转换）
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+        fd = os.open(filename, flags, 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
+        finally:
+            os.close(fd)
+
+        if self.optimize_png:
+            _optimize_png(filename, self.oxipng_level)
+
+    def get_text_info(self, text, text_bytes=None):
         """
         获取文本信息
 
         Args:
             text: 文本内容
+            text_bytes: 文本的UTF-8编码（已编码时传入，避免重复编码）
 
         Returns:
             dict: 包含文本长度、字节数、需要的二维码数量等信息
         """
-        text_bytes = text.encode('utf-8')
-        max_bytes = self.MAX_BYTES_PER_QR[self.error_correction_level]
-        num_qrcodes = math.ceil(len(text_bytes) / max_bytes)
-
-        return {
-            'char_count': len(text),
-            'byte_count': len(text_bytes),
-            'max_bytes_per_qr': max_bytes,
-            'num_qrcodes': num_qrcodes,
-            'error_correction': self.error_correction_level
-        }
+        return get_text_info(text, self.error_correction_level, text_bytes)
 
 
 def main():